@@ -1,11 +1,25 @@
 import asyncio
+import logging
 import os
+import queue
 import random
+import re
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple, Union
 
+import aiohttp
 import asyncpg
-from playwright.async_api import async_playwright, Page
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright, Route
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional and unavailable on Windows
+    uvloop = None
+
+log = logging.getLogger(__name__)
 
 # ====== Human-like rotation config ======
 BATCH_MIN = 13
@@ -18,6 +32,9 @@ SUBREDDIT_COOLDOWN_MIN_SEC = 13
 SUBREDDIT_COOLDOWN_MAX_SEC = 31
 
 POST_MAX_AGE_HOURS = 4
+
+SCRAPE_CONCURRENCY = 3
+CONTEXT_MAX_USES = 50
 # ========================================
 
 SUBREDDITS = [
@@ -29,90 +46,309 @@ SUBREDDITS = [
     "Bushcraft",
 ]
 
-DB_CONFIG = {
-    "user": "postgres",
-    "password": "225225225asS",
+DB_ENV_VARS = {
+    "user": "PG_USER",
+    "password": "PG_PASSWORD",
+    "database": "PG_DATABASE",
+    "host": "PG_HOST",
+    "port": "PG_PORT",
+}
+
+DB_DEFAULTS = {
     "database": "cbl",
-    "host": "91.98.162.31",
-    "port": 5432
+    "port": "5432",
 }
 
+DB_CONFIG = {key: os.getenv(env_var, DB_DEFAULTS.get(key)) for key, env_var in DB_ENV_VARS.items()}
+
+DB_POOL_MIN_SIZE = 2
+DB_POOL_MAX_SIZE = 8
+DB_COMMAND_TIMEOUT_SEC = 30
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = "%(asctime)s %(levelname)s %(message)s"
+
 STORAGE_STATE = os.getenv("PLAYWRIGHT_STORAGE_STATE")
+DEBUG_SCREENSHOTS = bool(os.getenv("DEBUG_SCREENSHOTS"))
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+HOT_JSON_LIMIT = 50
+HTTP_TIMEOUT_SEC = 20
+JSON_CONCURRENCY = 4
+JSON_DELAY_MIN_SEC = 0.5
+JSON_DELAY_MAX_SEC = 1.5
+JSON_REFUSED_STATUSES = {403, 429}
+
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+CHROMIUM_ARGS = [
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-features=VizDisplayCompositor",
+    "--memory-pressure-off",
+]
 
 
 
-def _validated_db_config() -> Dict[str, str]:
-    missing = [key for key, value in DB_CONFIG.items() if value in (None, "")]
+@lru_cache(maxsize=None)
+def _validated_db_config() -> Dict[str, Union[str, int]]:
+    missing = [DB_ENV_VARS[key] for key, value in DB_CONFIG.items() if value in (None, "")]
     if missing:
         raise RuntimeError(f"Missing DB config environment variables: {', '.join(missing)}")
-    return DB_CONFIG  # type: ignore[return-value]
+    port = str(DB_CONFIG["port"])
+    if not port.isdigit():
+        raise RuntimeError(f"Invalid DB config environment variable {DB_ENV_VARS['port']}: {port!r}")
+    config: Dict[str, Union[str, int]] = {key: str(value) for key, value in DB_CONFIG.items()}
+    config["port"] = int(port)
+    return config
 
 
-async def connect_db():
-    return await asyncpg.connect(**_validated_db_config())
+SEEN_POST_IDS_MAX = 10000
+SEEN_WARMUP_SQL = "SELECT post_id FROM reddit_posts WHERE seen_at > NOW() - INTERVAL '1 day' ORDER BY seen_at;"
 
+# Recently stored post ids, oldest first. Lets us skip posts we already know
+# about without paying a round-trip for ON CONFLICT to discard them.
+SEEN_POST_IDS: "OrderedDict[str, None]" = OrderedDict()
+
+POST_COLUMNS = ["subreddit", "post_id", "post_url", "score", "created_at"]
+COPY_THRESHOLD = 100
+
+INSERT_POST_SQL = """
+    INSERT INTO reddit_posts (subreddit, post_id, post_url, score, created_at, seen_at, commented)
+    VALUES ($1, $2, $3, $4, $5, NOW(), FALSE)
+    ON CONFLICT (post_id) DO NOTHING;
+"""
+
+CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE reddit_posts_staging ON COMMIT DROP AS
+    SELECT subreddit, post_id, post_url, score, created_at
+    FROM reddit_posts
+    WITH NO DATA;
+"""
+
+MERGE_STAGING_SQL = """
+    INSERT INTO reddit_posts (subreddit, post_id, post_url, score, created_at, seen_at, commented)
+    SELECT subreddit, post_id, post_url, score, created_at, NOW(), FALSE
+    FROM reddit_posts_staging
+    ON CONFLICT (post_id) DO NOTHING;
+"""
+
+
+class ScraperConnection(asyncpg.Connection):
+    """Connection that keeps the post INSERT prepared for its whole lifetime."""
+
+    __slots__ = ("insert_post_stmt",)
+
+
+async def _init_connection(conn: ScraperConnection):
+    conn.insert_post_stmt = await conn.prepare(INSERT_POST_SQL)
+
+
+async def create_db_pool() -> asyncpg.Pool:
+    return await asyncpg.create_pool(
+        **_validated_db_config(),
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        command_timeout=DB_COMMAND_TIMEOUT_SEC,
+        connection_class=ScraperConnection,
+        init=_init_connection,
+    )
 
-async def insert_reddit_post(
-    conn,
-    subreddit: str,
-    post_id: str,
-    post_url: str,
-    score: int,
-    created_at: datetime,
-):
-    query = """
-        INSERT INTO reddit_posts (subreddit, post_id, post_url, score, created_at, seen_at, commented)
-        VALUES ($1, $2, $3, $4, $5, NOW(), FALSE)
-        ON CONFLICT (post_id) DO NOTHING;
-    """
-    await conn.execute(query, subreddit, post_id, post_url, score, created_at)
-    print(f"✅ Saved Reddit post {post_id} from r/{subreddit}")
+
+def remember_post_ids(post_ids: List[str]):
+    for post_id in post_ids:
+        SEEN_POST_IDS[post_id] = None
+        SEEN_POST_IDS.move_to_end(post_id)
+    while len(SEEN_POST_IDS) > SEEN_POST_IDS_MAX:
+        SEEN_POST_IDS.popitem(last=False)
+
+
+async def warm_seen_post_ids(pool: asyncpg.Pool):
+    async with pool.acquire() as conn:
+        records = await conn.fetch(SEEN_WARMUP_SQL)
+    remember_post_ids([record["post_id"] for record in records])
+
+
+async def insert_reddit_posts(conn, rows: List[Tuple[str, str, str, int, datetime]]) -> int:
+    rows = [row for row in rows if row[1] not in SEEN_POST_IDS]
+    if not rows:
+        return 0
+    async with conn.transaction():
+        if len(rows) > COPY_THRESHOLD:
+            await conn.execute(CREATE_STAGING_SQL)
+            await conn.copy_records_to_table("reddit_posts_staging", records=rows, columns=POST_COLUMNS)
+            await conn.execute(MERGE_STAGING_SQL)
+        else:
+            await conn.insert_post_stmt.executemany(rows)
+    remember_post_ids([row[1] for row in rows])
+    return len(rows)
+
+
+_SCORE_RE = re.compile(r"\s*(-?[\d.]+)\s*([km]?)")
+_SCORE_MULTIPLIERS = {"k": 1000, "m": 1000000}
+
+_AGE_UNITS = {
+    "sec": "seconds",
+    "s": "seconds",
+    "min": "minutes",
+    "hou": "hours",
+    "hr": "hours",
+    "hrs": "hours",
+    "h": "hours",
+    "day": "days",
+    "d": "days",
+}
 
 
 def parse_score_text(score_text: str) -> int:
-    cleaned = score_text.strip().lower().replace("points", "").replace("point", "")
-    cleaned = cleaned.replace("votes", "").replace("vote", "").strip()
-    if not cleaned or cleaned in {"•"}:
+    match = _SCORE_RE.match(score_text.lower().replace(",", ""))
+    if not match:
         return 0
-    multiplier = 1
-    if cleaned.endswith("k"):
-        multiplier = 1000
-        cleaned = cleaned[:-1]
     try:
-        value = float(cleaned)
-        return int(value * multiplier)
+        value = float(match.group(1))
     except ValueError:
         return 0
+    return int(value * _SCORE_MULTIPLIERS.get(match.group(2), 1))
+
+
+def _parse_iso(value: str) -> datetime:
+    if value.endswith("Z"):
+        return datetime.fromisoformat(value[:-1] + "+00:00")
+    return datetime.fromisoformat(value)
 
 
-def parse_age_text(age_text: str) -> Optional[datetime]:
+def parse_age_text(age_text: str, now: Optional[datetime] = None) -> Optional[datetime]:
     text = age_text.strip().lower()
-    now = datetime.utcnow()
     if not text:
         return None
+    if now is None:
+        now = datetime.utcnow()
     if text in {"just now", "moments ago"}:
         return now
     parts = text.split()
-    if not parts:
-        return None
-    try:
-        amount_str = parts[0]
-        if amount_str in {"a", "an"}:
-            amount = 1
-        else:
+    amount_str = parts[0]
+    if amount_str in {"a", "an"}:
+        amount = 1.0
+    else:
+        try:
             amount = float(amount_str)
-    except ValueError:
+        except ValueError:
+            return None
+    unit = _AGE_UNITS.get(parts[1].rstrip(".")[:3]) if len(parts) > 1 else None
+    if unit is None:
         return None
-    unit = parts[1] if len(parts) > 1 else ""
-    if "min" in unit:
-        delta = timedelta(minutes=amount)
-    elif "hour" in unit or unit == "h":
-        delta = timedelta(hours=amount)
-    elif "sec" in unit or unit == "s":
-        delta = timedelta(seconds=amount)
+    return now - timedelta(**{unit: amount})
+
+
+# Selector sets for the two Reddit front-ends. Each scrape checks the variant
+# with one cheap probe (remembered in POST_SELECTORS) so field extraction
+# matches one selector per field instead of a list of alternatives.
+SHREDDIT_SELECTORS = {
+    "post": "shreddit-post",
+    "title": "a[slot='title']",
+    "permalink": "a[slot='full-post-link']",
+    "timestamp": "faceplate-timeago",
+    "time": "time",
+    "score": None,
+    "score_attr": "score",
+}
+
+LEGACY_SELECTORS = {
+    "post": "[data-testid='post-container']",
+    "title": "h3",
+    "permalink": "a[data-click-id='comments']",
+    "timestamp": "a[data-click-id='timestamp']",
+    "time": "time",
+    "score": "[data-click-id='score']",
+    "score_attr": None,
+}
+
+POST_SELECTORS: Optional[Dict[str, Optional[str]]] = None
+
+DETECT_UI_JS = "() => !!document.querySelector('shreddit-post')"
+
+# Collects every field the scraper needs in a single round-trip instead of
+# issuing several element queries per post.
+EXTRACT_POSTS_JS = """
+(sel) => Array.from(document.querySelectorAll(sel.post)).map((post) => {
+    const text = (el) => (el ? el.innerText : null);
+    const timestamp = post.querySelector(sel.timestamp);
+    const time = timestamp ? timestamp.querySelector(sel.time) : null;
+    const permalink = post.querySelector(sel.permalink);
+    return {
+        title: text(post.querySelector(sel.title)),
+        href: permalink ? permalink.getAttribute("href") : null,
+        datetime: time ? time.getAttribute("datetime") : null,
+        timestamp_text: text(timestamp),
+        score_text: sel.score_attr ? post.getAttribute(sel.score_attr) : text(post.querySelector(sel.score)),
+    };
+})
+"""
+
+
+async def get_post_selectors(page: Page) -> Dict[str, Optional[str]]:
+    """Wait for posts to render and return the selector set matching the page's UI."""
+    global POST_SELECTORS
+    await page.wait_for_selector(
+        f"{SHREDDIT_SELECTORS['post']}, {LEGACY_SELECTORS['post']}", timeout=20000
+    )
+    is_shreddit = await page.evaluate(DETECT_UI_JS)
+    selectors = SHREDDIT_SELECTORS if is_shreddit else LEGACY_SELECTORS
+    if POST_SELECTORS is not selectors:
+        # First probe, or Reddit switched this session to the other UI variant.
+        POST_SELECTORS = selectors
+        log.info("🧭 Detected %s Reddit UI", "shreddit" if is_shreddit else "legacy")
+    return selectors
+
+
+async def fetch_hot_json(
+    session: aiohttp.ClientSession, limiter: asyncio.Semaphore, subreddit: str
+) -> Optional[List[Tuple[str, str, str, int, datetime]]]:
+    """Return post rows from the hot.json listing, or None if the endpoint refuses us."""
+    url = f"https://www.reddit.com/r/{subreddit}/hot.json"
+    try:
+        async with limiter:
+            await asyncio.sleep(random.uniform(JSON_DELAY_MIN_SEC, JSON_DELAY_MAX_SEC))
+            async with session.get(url, params={"limit": HOT_JSON_LIMIT}) as resp:
+                if resp.status in JSON_REFUSED_STATUSES:
+                    log.warning(
+                        "🚫 JSON endpoint refused r/%s (HTTP %d), falling back to browser", subreddit, resp.status
+                    )
+                    return None
+                resp.raise_for_status()
+                try:
+                    data = await resp.json()
+                except aiohttp.ContentTypeError:
+                    # Reddit serves HTML interstitials with a 200 when it wants a real browser.
+                    log.warning("🚫 Non-JSON response for r/%s, falling back to browser", subreddit)
+                    return None
+
+        now = datetime.utcnow()
+        rows: List[Tuple[str, str, str, int, datetime]] = []
+        for child in data["data"]["children"]:
+            post = child["data"]
+            created_at = datetime.utcfromtimestamp(post["created_utc"])
+            if (now - created_at).total_seconds() / 3600 > POST_MAX_AGE_HOURS:
+                continue
+            post_url = f"https://www.reddit.com{post['permalink']}"
+            rows.append((subreddit, post["id"], post_url, int(post["score"]), created_at))
+    except Exception as e:
+        log.error("❌ Error fetching r/%s JSON: %s", subreddit, e)
+        return []
+
+    if not rows:
+        log.info("⚠ No suitable posts found for r/%s", subreddit)
+    return rows
+
+
+async def block_heavy_resources(route: Route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
     else:
-        return None
-    return now - delta
+        await route.continue_()
 
 
 async def load_additional_posts(page: Page, scroll_times: int = 3):
@@ -121,60 +357,47 @@ async def load_additional_posts(page: Page, scroll_times: int = 3):
         await asyncio.sleep(random.uniform(0.8, 1.4))
 
 
-async def scrape_subreddit(conn, page: Page, subreddit: str):
-    print(f"\n🔍 Scraping r/{subreddit} ...")
+async def scrape_subreddit(pool: asyncpg.Pool, page: Page, subreddit: str):
+    log.info("🔍 Scraping r/%s ...", subreddit)
     url = f"https://www.reddit.com/r/{subreddit}/hot/"
+    now = datetime.utcnow()
 
     try:
-        await page.goto(url, timeout=60000, wait_until="networkidle")
-        await page.wait_for_selector("div[data-testid='post-container'], article[data-testid='post-container']", timeout=20000)
+        await page.goto(url, timeout=30000, wait_until="domcontentloaded")
+        selectors = await get_post_selectors(page)
 
         await load_additional_posts(page)
-        posts = await page.query_selector_all("div[data-testid='post-container'], article[data-testid='post-container']")
-        valid_count = 0
+        posts = await page.evaluate(EXTRACT_POSTS_JS, selectors)
+        buffer: List[Tuple[str, str, str, int, datetime]] = []
 
         for post in posts:
-            title_el = await post.query_selector("h3")
-            if not title_el:
-                continue
-            title = (await title_el.inner_text()).strip()
+            title = (post["title"] or "").strip()
             if not title:
                 continue
 
-            timestamp_anchor = await post.query_selector("a[data-click-id='timestamp']")
-            time_el = None
             datetime_value: Optional[datetime] = None
-            if timestamp_anchor:
-                time_el = await timestamp_anchor.query_selector("time")
-
-            if time_el:
-                datetime_str = await time_el.get_attribute("datetime")
-                if datetime_str:
-                    try:
-                        datetime_value = datetime.fromisoformat(datetime_str.replace("Z", "+00:00"))
-                    except ValueError:
-                        datetime_value = None
-            if not datetime_value and timestamp_anchor:
-                timestamp_text = (await timestamp_anchor.inner_text()).strip()
-                datetime_value = parse_age_text(timestamp_text)
+            datetime_str = post["datetime"]
+            if datetime_str:
+                try:
+                    datetime_value = _parse_iso(datetime_str)
+                except ValueError:
+                    datetime_value = None
+            if not datetime_value and post["timestamp_text"]:
+                datetime_value = parse_age_text(post["timestamp_text"], now)
 
             if not datetime_value:
-                print("⛔ No timestamp")
+                log.debug("⛔ No timestamp")
                 continue
 
-            age_hours = (datetime.utcnow() - datetime_value.replace(tzinfo=None)).total_seconds() / 3600
+            datetime_value = datetime_value.replace(tzinfo=None)
+            age_hours = (now - datetime_value).total_seconds() / 3600
             if age_hours > POST_MAX_AGE_HOURS:
-                print(f"⛔ Too old ({round(age_hours)}h)")
+                log.debug("⛔ Too old (%dh)", round(age_hours))
                 continue
 
-            permalink_el = await post.query_selector("a[data-click-id='comments'], a[data-click-id='body']")
-            if not permalink_el:
-                print("⛔ No permalink")
-                continue
-
-            href = await permalink_el.get_attribute("href")
+            href = post["href"]
             if not href:
-                print("⛔ Empty permalink")
+                log.debug("⛔ No permalink")
                 continue
 
             if href.startswith("/"):
@@ -189,22 +412,75 @@ async def scrape_subreddit(conn, page: Page, subreddit: str):
                 except IndexError:
                     post_id = post_url
 
-            score_el = await post.query_selector("[data-click-id='score'], div[data-test-id='post-content'] span")
-            score = 0
-            if score_el:
-                score_text = (await score_el.inner_text()).strip()
-                score = parse_score_text(score_text)
+            score = parse_score_text(post["score_text"]) if post["score_text"] else 0
+
+            log.debug("✅ Valid new post: %s", post_url)
+            buffer.append((subreddit, post_id, post_url, score, datetime_value))
+
+        if not buffer:
+            log.info("⚠ No suitable posts found for r/%s", subreddit)
+        else:
+            async with pool.acquire() as conn:
+                saved = await insert_reddit_posts(conn, buffer)
+            log.info("✅ Submitted %d unseen posts from r/%s", saved, subreddit)
+
+    except Exception as e:
+        log.error("❌ Error scraping r/%s: %s", subreddit, e)
+        if DEBUG_SCREENSHOTS:
+            await page.screenshot(path=f"debug_error_{subreddit}.jpg", type="jpeg", quality=60, full_page=False)
+
 
-            print(f"✅ Valid new post: {post_url}")
-            await insert_reddit_post(conn, subreddit, post_id, post_url, score, datetime_value.replace(tzinfo=None))
-            valid_count += 1
+async def new_scraping_context(browser: Browser) -> BrowserContext:
+    context_args = {}
+    if STORAGE_STATE:
+        context_args["storage_state"] = STORAGE_STATE
+    context = await browser.new_context(**context_args)
+    await context.route("**/*", block_heavy_resources)
+    return context
 
-        if valid_count == 0:
-            print(f"⚠ No suitable posts found for r/{subreddit}")
 
+async def scrape_with_context(pool: asyncpg.Pool, browser: Browser, contexts: asyncio.Queue, subreddit: str):
+    context, uses = await contexts.get()
+    try:
+        wait_s = random.randint(SUBREDDIT_COOLDOWN_MIN_SEC, SUBREDDIT_COOLDOWN_MAX_SEC)
+        log.info("⏳ Cooldown before r/%s: %ds", subreddit, wait_s)
+        await asyncio.sleep(wait_s)
+
+        page = await context.new_page()
+        try:
+            await scrape_subreddit(pool, page, subreddit)
+        finally:
+            await page.close()
     except Exception as e:
-        print(f"❌ Error scraping r/{subreddit}: {e}")
-        await page.screenshot(path=f"debug_error_{subreddit}.png", full_page=True)
+        log.warning("⚠ Error on r/%s: %s", subreddit, e)
+    finally:
+        uses += 1
+        if uses >= CONTEXT_MAX_USES:
+            # Long-lived contexts slowly accumulate memory; swap in a fresh one.
+            try:
+                await context.close()
+                context, uses = await new_scraping_context(browser), 0
+            except Exception as e:
+                log.warning("⚠ Error recycling browser context: %s", e)
+        contexts.put_nowait((context, uses))
+
+
+def setup_logging() -> QueueListener:
+    """Queue log records for a listener thread that formats and writes them.
+
+    The calling thread still merges each message with its args before queueing;
+    only the final formatting and the stream write happen off the event loop.
+    """
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    listener = QueueListener(log_queue, handler)
+
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)]
+    root.setLevel(LOG_LEVEL)
+    listener.start()
+    return listener
 
 
 async def get_subreddits_for_this_loop() -> List[str]:
@@ -215,51 +491,107 @@ async def get_subreddits_for_this_loop() -> List[str]:
     return selected
 
 
-async def run_scraper():
-    conn = await connect_db()
-    print("✅ DB connected!\n")
-
-    while True:
-        print("⏱️ Checking new reddit posts...\n")
-
-        subreddits = await get_subreddits_for_this_loop()
-        if not subreddits:
-            backoff = random.randint(120, 240)
-            print(f"😴 No subreddits configured. Sleeping {backoff}s...\n")
-            await asyncio.sleep(backoff)
-            continue
-
-        random.shuffle(subreddits)
-        print(f"🎯 This run will scrape {len(subreddits)} subreddits.\n")
-
-        async with async_playwright() as pw:
-            browser = await pw.chromium.launch(headless=True)
-            context_args = {}
-            if STORAGE_STATE:
-                context_args["storage_state"] = STORAGE_STATE
-            context = await browser.new_context(**context_args)
-            page = await context.new_page()
-
-            for subreddit in subreddits:
-                try:
-                    await scrape_subreddit(conn, page, subreddit)
-                except Exception as e:
-                    print(f"⚠ Error on r/{subreddit}: {e}")
+async def scrape_loop():
+    pool = await create_db_pool()
+    log.info("✅ DB pool ready!")
+
+    session = aiohttp.ClientSession(
+        headers={"User-Agent": USER_AGENT},
+        timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SEC),
+    )
+
+    # The browser is only needed when the JSON endpoint refuses us, so it is
+    # launched on first use and then kept alive for the rest of the process.
+    playwright: Optional[Playwright] = None
+    browser: Optional[Browser] = None
+    contexts: asyncio.Queue = asyncio.Queue()
+
+    try:
+        await warm_seen_post_ids(pool)
+        log.info("🧠 Loaded %d recently seen post ids", len(SEEN_POST_IDS))
 
-                wait_s = random.randint(SUBREDDIT_COOLDOWN_MIN_SEC, SUBREDDIT_COOLDOWN_MAX_SEC)
-                print(f"⏳ Cooldown: {wait_s}s\n")
-                await asyncio.sleep(wait_s)
+        while True:
+            log.info("⏱️ Checking new reddit posts...")
 
-            await context.close()
+            subreddits = await get_subreddits_for_this_loop()
+            if not subreddits:
+                backoff = random.randint(120, 240)
+                log.info("😴 No subreddits configured. Sleeping %ds...", backoff)
+                await asyncio.sleep(backoff)
+                continue
+
+            log.info("🎯 This run will scrape %d subreddits.", len(subreddits))
+
+            limiter = asyncio.Semaphore(JSON_CONCURRENCY)
+            results = await asyncio.gather(
+                *(fetch_hot_json(session, limiter, subreddit) for subreddit in subreddits)
+            )
+
+            rows: List[Tuple[str, str, str, int, datetime]] = []
+            fallback: List[str] = []
+            for subreddit, result in zip(subreddits, results):
+                if result is None:
+                    fallback.append(subreddit)
+                else:
+                    rows.extend(result)
+
+            if rows:
+                try:
+                    async with pool.acquire() as conn:
+                        saved = await insert_reddit_posts(conn, rows)
+                    log.info("✅ Submitted %d unseen posts from the JSON endpoint", saved)
+                except Exception as e:
+                    log.error("❌ Error saving posts from the JSON endpoint: %s", e)
+
+            if fallback:
+                log.info("🌐 Falling back to the browser for %d subreddits.", len(fallback))
+                if browser is not None and not browser.is_connected():
+                    # Chromium crashed or disconnected; its contexts are unusable,
+                    # so drop them and start over with a fresh browser.
+                    log.warning("⚠ Browser disconnected, relaunching")
+                    browser = None
+                    while not contexts.empty():
+                        contexts.get_nowait()
+                if browser is None:
+                    if playwright is None:
+                        playwright = await async_playwright().start()
+                    browser = await playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+                    # Each context is an isolated browser session; the queue hands at
+                    # most one subreddit to a context at a time.
+                    for _ in range(SCRAPE_CONCURRENCY):
+                        contexts.put_nowait((await new_scraping_context(browser), 0))
+
+                await asyncio.gather(
+                    *(scrape_with_context(pool, browser, contexts, subreddit) for subreddit in fallback)
+                )
+
+            loop_wait = random.randint(LOOP_DELAY_MIN_SEC, LOOP_DELAY_MAX_SEC)
+            mins = round(loop_wait / 60, 1)
+            log.info("✅ Run finished. Next loop in ~%s min (%ds)", mins, loop_wait)
+            await asyncio.sleep(loop_wait)
+    finally:
+        await session.close()
+        if browser is not None and browser.is_connected():
+            while not contexts.empty():
+                context, _ = contexts.get_nowait()
+                await context.close()
             await browser.close()
+        if playwright is not None:
+            await playwright.stop()
+        await pool.close()
+
 
-        loop_wait = random.randint(LOOP_DELAY_MIN_SEC, LOOP_DELAY_MAX_SEC)
-        mins = round(loop_wait / 60, 1)
-        print(f"✅ Run finished. Next loop in ~{mins} min ({loop_wait}s)\n")
-        await asyncio.sleep(loop_wait)
+async def run_scraper():
+    listener = setup_logging()
+    try:
+        log.info("🚀 Starting Reddit subreddit scraper...")
+        await scrape_loop()
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":
-    print("🚀 Starting Reddit subreddit scraper...")
+    if uvloop is not None:
+        uvloop.install()
     asyncio.run(run_scraper())
 